@@ -2,29 +2,33 @@
 """
 Generate PNG icons from SVG files for Chrome extension
 Supports multiple conversion methods based on available tools
+
+Each target is fingerprinted from its SVG source, size, converter and
+this script's source (which holds the converter settings);
+unchanged targets are skipped and the rest are rendered in parallel.
+Pass --force to regenerate everything.
 """
 
+import shutil
 import subprocess
 import sys
-import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-SCRIPT_DIR = Path(__file__).parent
-SIZES = {
-    'icon': [16, 48, 128],  # Extension icons
-    'success': [128],        # Notification icons
-    'error': [128],
-    'warning': [128],
-    'info': [128]
-}
+from icon_cache import SCRIPT_DIR, SIZES, IconCache, fingerprint, png_path
 
 
 def check_tool(command):
     """Check if a command-line tool is available"""
+    return shutil.which(command) is not None
+
+
+def has_cairosvg():
+    """Check if the cairosvg Python library is importable"""
     try:
-        subprocess.run([command, '--version'], capture_output=True, check=True)
+        import cairosvg  # noqa: F401
         return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    except ImportError:
         return False
 
 
@@ -81,43 +85,34 @@ def convert_with_cairosvg(svg_file, png_file, size):
         return False
 
 
-def main():
-    print("🎨 Generating PNG icons from SVG files...")
-    print()
-
-    # Detect available conversion tool
-    converter = None
+def detect_converter():
+    """Pick the first available SVG conversion tool"""
     if check_tool('convert'):
         print("✓ Using ImageMagick (convert)")
-        converter = convert_with_imagemagick
-    elif check_tool('inkscape'):
+        return convert_with_imagemagick
+    if check_tool('inkscape'):
         print("✓ Using Inkscape")
-        converter = convert_with_inkscape
-    elif check_tool('rsvg-convert'):
+        return convert_with_inkscape
+    if check_tool('rsvg-convert'):
         print("✓ Using rsvg-convert")
-        converter = convert_with_rsvg
-    else:
-        # Try Python cairosvg
-        svg_file = SCRIPT_DIR / 'icon.svg'
-        png_file = SCRIPT_DIR / 'test.png'
-        if convert_with_cairosvg(svg_file, png_file, 16):
-            print("✓ Using cairosvg (Python library)")
-            converter = convert_with_cairosvg
-            png_file.unlink()  # Remove test file
-        else:
-            print("❌ No SVG conversion tool found!")
-            print()
-            print("Please install one of:")
-            print("  • ImageMagick:  brew install imagemagick")
-            print("  • Inkscape:     brew install inkscape")
-            print("  • rsvg-convert: brew install librsvg")
-            print("  • cairosvg:     pip3 install cairosvg")
-            sys.exit(1)
+        return convert_with_rsvg
+    if has_cairosvg():
+        print("✓ Using cairosvg (Python library)")
+        return convert_with_cairosvg
 
+    print("❌ No SVG conversion tool found!")
     print()
-    generated = 0
+    print("Please install one of:")
+    print("  • ImageMagick:  brew install imagemagick")
+    print("  • Inkscape:     brew install inkscape")
+    print("  • rsvg-convert: brew install librsvg")
+    print("  • cairosvg:     pip3 install cairosvg")
+    sys.exit(1)
+
 
-    # Generate icons
+def collect_targets(cache, converter, script_source, force=False):
+    """Return (svg_file, png_file, size, digest) for every stale target"""
+    targets = []
     for name, sizes in SIZES.items():
         svg_file = SCRIPT_DIR / f'{name}.svg'
 
@@ -125,21 +120,68 @@ def main():
             print(f"⚠️  Skipping {name}.svg (not found)")
             continue
 
+        source = svg_file.read_bytes()
         for size in sizes:
-            if name == 'icon':
-                png_file = SCRIPT_DIR / f'icon{size}.png'
-            else:
-                png_file = SCRIPT_DIR / f'{name}.png'
-
-            try:
-                converter(svg_file, png_file, size)
-                print(f"✓ Generated {png_file.name} ({size}x{size})")
-                generated += 1
-            except Exception as e:
-                print(f"✗ Failed to generate {png_file.name}: {e}")
+            png_file = png_path(name, size)
+            digest = fingerprint('svg', converter.__name__, script_source, source, size)
+            if not force and cache.is_fresh(png_file, digest):
+                print(f"• {png_file.name} is up to date")
+                continue
+            targets.append((svg_file, png_file, size, digest))
+    return targets
+
+
+def main():
+    force = '--force' in sys.argv[1:]
+
+    print("🎨 Generating PNG icons from SVG files...")
+    print()
+
+    converter = detect_converter()
+    print()
+
+    cache = IconCache(SCRIPT_DIR)
+    script_source = Path(__file__).read_bytes()
+    targets = collect_targets(cache, converter, script_source, force)
+    generated = 0
+
+    if targets:
+        # Drop stale entries up front so a failed or interrupted render
+        # is never mistaken for an up-to-date one on the next run
+        for _, png_file, _, _ in targets:
+            cache.invalidate(png_file)
+        cache.save()
+
+        # The command-line converters already run in their own process;
+        # only cairosvg renders in-process and benefits from a process pool
+        if converter is convert_with_cairosvg:
+            executor = ProcessPoolExecutor()
+        else:
+            executor = ThreadPoolExecutor()
+
+        with executor as pool:
+            futures = {
+                pool.submit(converter, svg_file, png_file, size): (png_file, size, digest)
+                for svg_file, png_file, size, digest in targets
+            }
+            for future in as_completed(futures):
+                png_file, size, digest = futures[future]
+                try:
+                    if future.result() is False:
+                        raise RuntimeError('converter unavailable')
+                    cache.update(png_file, digest)
+                    print(f"✓ Generated {png_file.name} ({size}x{size})")
+                    generated += 1
+                except Exception as e:
+                    print(f"✗ Failed to generate {png_file.name}: {e}")
+
+        cache.save()
 
     print()
-    print(f"🎉 Done! Generated {generated} PNG icon(s)")
+    if targets:
+        print(f"🎉 Done! Generated {generated} PNG icon(s)")
+    else:
+        print("🎉 Done! All PNG icons are up to date")
     print()
     print("Generated files:")
     for f in sorted(SCRIPT_DIR.glob('*.png')):
@@ -2,8 +2,14 @@
 """
 Generate simple PNG icons without external dependencies
 Creates solid color icons with symbols using PIL/Pillow
+
+Each glyph is drawn once at high resolution and downsampled to every
+size it is needed at. Outputs are fingerprinted from this script's
+source and their size, so icons are only redrawn when something changed.
+Pass --force to regenerate everything.
 """
 
+import math
 import sys
 
 try:
@@ -14,7 +20,14 @@ except ImportError:
 
 from pathlib import Path
 
-SCRIPT_DIR = Path(__file__).parent
+from icon_cache import SCRIPT_DIR, SIZES, IconCache, fingerprint, png_path
+
+# Glyphs are drawn at this size, then downsampled
+MASTER_SIZE = 256
+
+# Below this size strokes hit their minimum width, so the glyph gets its
+# own supersampled drawing instead of sharing the master
+SMALL_SIZE = 32
 
 # Colors matching Claude branding
 COLORS = {
@@ -26,9 +39,15 @@ COLORS = {
 }
 
 
-def create_icon_pil(name, size):
-    """Create icon using PIL"""
+def create_icon_pil(name, size, target=None):
+    """Create icon using PIL
+
+    Stroke widths are chosen for the target output size (defaults to size)
+    and scaled up, so supersampled drawings keep thin sizes legible.
+    """
     color = COLORS.get(name, '#D97706')
+    target = target or size
+    scale = size / target
 
     # Create image with rounded corners
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
@@ -43,7 +62,7 @@ def create_icon_pil(name, size):
 
     # Draw symbol
     white = '#FFFFFF'
-    line_width = max(2, size // 16)
+    line_width = round(max(2, target // 16) * scale)
 
     if name == 'success':
         # Checkmark
@@ -96,11 +115,15 @@ def create_icon_pil(name, size):
         # Draw "C" for Claude
         center = size // 2
         radius = size * 0.35
-        thickness = max(2, size // 12)
+        thickness = round(max(2, target // 12) * scale)
 
-        # Draw C using arc (simplified as a partial circle)
-        for angle in range(45, 315, 5):
-            import math
+        # Draw C as a single thick arc with rounded ends
+        outer = radius + thickness
+        draw.arc(
+            [center - outer, center - outer, center + outer, center + outer],
+            start=45, end=310, fill=white, width=thickness * 2
+        )
+        for angle in (45, 310):
             x = center + radius * math.cos(math.radians(angle))
             y = center + radius * math.sin(math.radians(angle))
             draw.ellipse(
@@ -120,6 +143,21 @@ def create_icon_pil(name, size):
     return img
 
 
+def render_icon_set(name, sizes):
+    """Draw a glyph once at MASTER_SIZE and save it at each requested size"""
+    master = None
+    for size in sizes:
+        if size < SMALL_SIZE:
+            img = create_icon_pil(name, MASTER_SIZE, target=size)
+        else:
+            if master is None:
+                master = create_icon_pil(name, MASTER_SIZE)
+            img = master
+        if size != MASTER_SIZE:
+            img = img.resize((size, size), Image.LANCZOS)
+        img.save(png_path(name, size), 'PNG')
+
+
 def main():
     if not HAS_PIL:
         print("❌ PIL/Pillow not found!")
@@ -130,26 +168,51 @@ def main():
         print("Or install an SVG converter and run generate_icons.py instead")
         sys.exit(1)
 
+    force = '--force' in sys.argv[1:]
+
     print("🎨 Generating PNG icons with PIL...")
     print()
 
+    cache = IconCache(SCRIPT_DIR)
+    source = Path(__file__).read_bytes()
+    stale = {}
+    for name, sizes in SIZES.items():
+        for size in sizes:
+            png_file = png_path(name, size)
+            digest = fingerprint('pil', source, size)
+            if not force and cache.is_fresh(png_file, digest):
+                print(f"• {png_file.name} is up to date")
+                continue
+            stale.setdefault(name, []).append((size, png_file, digest))
+
+    if not stale:
+        print()
+        print("🎉 Done! All PNG icons are up to date")
+        return
+
+    # Drop stale entries up front so a failed or interrupted render
+    # is never mistaken for an up-to-date one on the next run
+    for targets in stale.values():
+        for _, png_file, _ in targets:
+            cache.invalidate(png_file)
+    cache.save()
+
     generated = 0
 
-    # Generate main extension icons
-    for size in [16, 48, 128]:
-        png_file = SCRIPT_DIR / f'icon{size}.png'
-        img = create_icon_pil('icon', size)
-        img.save(png_file, 'PNG')
-        print(f"✓ Generated icon{size}.png")
-        generated += 1
-
-    # Generate notification icons (128x128)
-    for name in ['success', 'error', 'warning', 'info']:
-        png_file = SCRIPT_DIR / f'{name}.png'
-        img = create_icon_pil(name, 128)
-        img.save(png_file, 'PNG')
-        print(f"✓ Generated {name}.png")
-        generated += 1
+    # Each glyph draws in a few milliseconds, far less than starting
+    # worker processes would cost, so render them inline
+    for name, targets in stale.items():
+        try:
+            render_icon_set(name, [size for size, _, _ in targets])
+        except Exception as e:
+            print(f"✗ Failed to generate {name} icons: {e}")
+            continue
+        for _, png_file, digest in targets:
+            cache.update(png_file, digest)
+            print(f"✓ Generated {png_file.name}")
+            generated += 1
+
+    cache.save()
 
     print()
     print(f"🎉 Done! Generated {generated} PNG icons")
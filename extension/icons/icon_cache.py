@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Shared icon targets and content-hash cache for the icon generators
+Records a fingerprint per generated PNG so unchanged targets are skipped
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+CACHE_FILE = '.icon-cache.json'
+
+SIZES = {
+    'icon': [16, 48, 128],  # Extension icons
+    'success': [128],        # Notification icons
+    'error': [128],
+    'warning': [128],
+    'info': [128]
+}
+
+
+def png_path(name, size):
+    """Return the PNG file an icon is written to at the given size"""
+    if name == 'icon':
+        return SCRIPT_DIR / f'icon{size}.png'
+    return SCRIPT_DIR / f'{name}.png'
+
+
+def fingerprint(*parts):
+    """Hash the inputs that determine a rendered icon"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = str(part).encode('utf-8')
+        # Length prefix keeps ('ab', 'c') and ('a', 'bc') distinct
+        digest.update(len(part).to_bytes(8, 'big'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class IconCache:
+    """Maps PNG file names to the fingerprint they were last rendered from"""
+
+    def __init__(self, directory):
+        self.path = Path(directory) / CACHE_FILE
+        try:
+            self.entries = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def is_fresh(self, png_file, digest):
+        """True if png_file exists and was rendered from the same inputs"""
+        return png_file.exists() and self.entries.get(png_file.name) == digest
+
+    def update(self, png_file, digest):
+        """Record that png_file was rendered from digest"""
+        self.entries[png_file.name] = digest
+
+    def invalidate(self, png_file):
+        """Forget png_file until it is rendered again successfully"""
+        self.entries.pop(png_file.name, None)
+
+    def save(self):
+        """Write the cache back to disk"""
+        self.path.write_text(json.dumps(self.entries, indent=2, sort_keys=True) + '\n')